@@ -21,8 +21,10 @@ Example:
 
 import argparse
 import os
+import shutil
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from dotenv import load_dotenv
@@ -96,17 +98,19 @@ def generate_image(prompt: str, api_key: str) -> Image.Image:
             contents=contents,
             config=generate_content_config,
         ):
-            if (
-                chunk.candidates is None
-                or chunk.candidates[0].content is None
-                or chunk.candidates[0].content.parts is None
-            ):
+            candidates = chunk.candidates
+            if not candidates:
+                continue
+            content = candidates[0].content
+            if content is None:
+                continue
+            parts = content.parts
+            if not parts:
                 continue
 
             # Check for image data
-            if (chunk.candidates[0].content.parts[0].inline_data and
-                chunk.candidates[0].content.parts[0].inline_data.data):
-                inline_data = chunk.candidates[0].content.parts[0].inline_data
+            inline_data = parts[0].inline_data
+            if inline_data is not None and inline_data.data:
                 image_data = inline_data.data
                 print("✓ Image received")
             elif chunk.text:
@@ -124,22 +128,12 @@ def generate_image(prompt: str, api_key: str) -> Image.Image:
         sys.exit(1)
 
 
-def resize_to_1024(image: Image.Image) -> Image.Image:
-    """Resize image to 1024x1024 if needed."""
-    if image.size != (1024, 1024):
-        print(f"Resizing from {image.size[0]}x{image.size[1]} to 1024x1024")
-        return image.resize((1024, 1024), Image.Resampling.LANCZOS)
-    return image
-
-
 def save_stamp(image: Image.Image, stamp_number: int) -> Path:
     """Save image as a stamp and resize to 512x512."""
-    # First resize to 1024x1024 if needed
-    image = resize_to_1024(image)
-
-    # Then resize to 512x512 (standard stamp size)
-    print("Resizing to 512x512 for stamp...")
-    resized = image.resize((512, 512), Image.Resampling.LANCZOS)
+    # Resize straight to 512x512 (standard stamp size) in a single pass
+    print(f"Resizing from {image.size[0]}x{image.size[1]} to 512x512 for stamp...")
+    # reducing_gap lets Pillow box-reduce large sources before the LANCZOS pass
+    resized = image.resize((512, 512), Image.Resampling.LANCZOS, reducing_gap=3.0)
 
     # Ensure RGBA mode for PNG with transparency support
     if resized.mode != 'RGBA':
@@ -158,26 +152,35 @@ def rebuild_assets():
     """Rebuild tilesheet and Ulanzi profile."""
     print("\nRebuilding assets...")
 
+    # Resolve npm explicitly so Windows picks up the npm.cmd shim without a shell
+    npm = shutil.which("npm")
+    if npm is None:
+        print("Error rebuilding assets: npm not found on PATH", file=sys.stderr)
+        sys.exit(1)
+
     try:
-        # Generate tilesheet
-        result = subprocess.run(
-            ["npm", "run", "generate-tilesheet"],
-            capture_output=True,
-            text=True,
-            check=True,
-            shell=True  # Required for Windows
-        )
-        print(result.stdout)
-
-        # Generate Ulanzi profile
-        result = subprocess.run(
-            ["npm", "run", "generate-streamdeck"],
-            capture_output=True,
-            text=True,
-            check=True,
-            shell=True  # Required for Windows
-        )
-        print(result.stdout)
+        # Generate tilesheet and Ulanzi profile in parallel (they're independent)
+        processes = [
+            subprocess.Popen(
+                [npm, "run", script],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+            )
+            for script in ("generate-tilesheet", "generate-streamdeck")
+        ]
+
+        # Drain each process's pipes on its own thread so neither one stalls
+        # on a full pipe buffer while the other is still running
+        with ThreadPoolExecutor() as executor:
+            outputs = list(executor.map(subprocess.Popen.communicate, processes))
+
+        for process, (stdout, stderr) in zip(processes, outputs):
+            if process.returncode != 0:
+                raise subprocess.CalledProcessError(
+                    process.returncode, process.args, stdout, stderr
+                )
+            print(stdout)
 
         print("✓ Assets rebuilt successfully")
 
@@ -185,6 +188,9 @@ def rebuild_assets():
         print(f"Error rebuilding assets: {e}", file=sys.stderr)
         print(e.stderr, file=sys.stderr)
         sys.exit(1)
+    except OSError as e:
+        print(f"Error rebuilding assets: {e}", file=sys.stderr)
+        sys.exit(1)
 
 
 def main():
@@ -19,6 +19,7 @@ Arguments:
                  Default: "Coloring Page Maker.ulanziDeckProfile"
 """
 
+import io
 import json
 import os
 import shutil
@@ -26,8 +27,9 @@ import sys
 import tempfile
 import uuid
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from hashlib import md5
+from hashlib import blake2b
 
 try:
     from PIL import Image
@@ -35,6 +37,15 @@ except ImportError:
     print("Warning: PIL not available, thumbnails will not be generated", file=sys.stderr)
     Image = None
 
+# Prebuilt icon shown for the profile in Ulanzi Studio
+PROFILE_ICON = Path(__file__).parent / "assets" / "profile_icon.png"
+
+# Thumbnails are cached between runs, keyed on the source hash, size and
+# cache version. Bump the version whenever create_thumbnail's output changes
+THUMBNAIL_CACHE_DIR = Path(__file__).parent / ".cache" / "thumbs"
+THUMBNAIL_CACHE_VERSION = 1
+THUMBNAIL_SIZE = 80
+
 
 def get_stamp_images(stamps_dir: Path) -> list[tuple[int, Path]]:
     """Get list of stamp images from the public/stamps directory."""
@@ -52,26 +63,55 @@ def get_stamp_images(stamps_dir: Path) -> list[tuple[int, Path]]:
     return stamp_images
 
 
-def hash_file(file_path: Path) -> str:
-    """Generate MD5 hash of a file for consistent naming."""
-    return md5(file_path.read_bytes()).hexdigest()
+def hash_bytes(data: bytes) -> str:
+    """Generate a BLAKE2 hash of file contents for consistent naming."""
+    return blake2b(data, digest_size=16).hexdigest()
+
+
+def cache_file(source: Path, cache_path: Path):
+    """Copy a file into the cache atomically so a partial copy is never visible."""
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as dst, open(source, 'rb') as src:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_name, cache_path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
 
 
-def create_thumbnail(source_image: Path, output_path: Path, size: int = 80):
-    """Create a thumbnail for the stream deck button."""
+def create_thumbnail(source_data: bytes, output_path: Path, size: int = 80):
+    """Create a thumbnail for the stream deck button from encoded image bytes."""
     if Image is None:
         # If PIL is not available, just copy the original
-        shutil.copy2(source_image, output_path)
+        output_path.write_bytes(source_data)
+        return
+
+    img = Image.open(io.BytesIO(source_data))
+
+    # open() only parses the header, so a source that is already a correctly
+    # sized RGBA PNG can be written out as-is without decoding the pixel data
+    if img.format == 'PNG' and img.mode == 'RGBA' and img.size == (size, size):
+        output_path.write_bytes(source_data)
         return
 
-    img = Image.open(source_image)
+    # Let JPEG sources decode at a reduced scale (no-op for PNG); this must
+    # happen before convert(), which forces a full-resolution decode
+    img.draft(None, (size * 2, size * 2))
 
     # Convert to RGBA if not already
     if img.mode != 'RGBA':
         img = img.convert('RGBA')
 
-    # Resize maintaining aspect ratio
-    img.thumbnail((size, size), Image.Resampling.LANCZOS)
+    # Resize maintaining aspect ratio. Area averaging is plenty for a small
+    # button icon and much cheaper than LANCZOS
+    img.thumbnail((size, size), Image.Resampling.BOX)
+
+    # Square sources already fill the button, so there's nothing to center
+    if img.size == (size, size):
+        img.save(output_path, 'PNG')
+        return
 
     # Create a new image with transparent background
     thumb = Image.new('RGBA', (size, size), (0, 0, 0, 0))
@@ -106,6 +146,26 @@ def create_action(stamp_num: int, icon_filename: str, hotkey_letter: str) -> dic
     }
 
 
+def _create_stamp_icon(stamp_data: bytes, icon_hash: str, images_dir: Path) -> Path:
+    """Create the button icon for a stamp and return the written path."""
+    output_path = images_dir / f"{icon_hash}.png"
+
+    # Reuse a cached thumbnail if this stamp hasn't changed since the last run
+    cache_path = THUMBNAIL_CACHE_DIR / f"{icon_hash}_{THUMBNAIL_SIZE}_v{THUMBNAIL_CACHE_VERSION}.png"
+    if Image is not None and cache_path.exists():
+        shutil.copyfile(cache_path, output_path)
+        return output_path
+
+    # Copy and create thumbnail
+    create_thumbnail(stamp_data, output_path, THUMBNAIL_SIZE)
+    if Image is not None:
+        try:
+            cache_file(output_path, cache_path)
+        except OSError as e:
+            print(f"Warning: Could not cache thumbnail {cache_path}: {e}", file=sys.stderr)
+    return output_path
+
+
 def generate_profile(stamps_dir: Path, output_file: Path, device_model: str = "D200H"):
     """Generate a complete Ulanzi Studio profile."""
 
@@ -114,8 +174,12 @@ def generate_profile(stamps_dir: Path, output_file: Path, device_model: str = "D
     if not stamp_images:
         raise ValueError(f"No stamp images found in {stamps_dir}")
 
-    # Create temporary directory structure
-    with tempfile.TemporaryDirectory() as tmpdir:
+    # Create temporary directory structure, on tmpfs where available since
+    # everything written here is read straight back into the zip
+    shm_dir = "/dev/shm"
+    if not (os.path.isdir(shm_dir) and os.access(shm_dir, os.W_OK | os.X_OK)):
+        shm_dir = None
+    with tempfile.TemporaryDirectory(dir=shm_dir) as tmpdir:
         tmpdir = Path(tmpdir)
 
         # Generate UUIDs for profile structure
@@ -130,6 +194,10 @@ def generate_profile(stamps_dir: Path, output_file: Path, device_model: str = "D
         images_dir = pages_dir / "Images"
         images_dir.mkdir(parents=True)
 
+        # Track every file written so the zip doesn't need to rescan the tree.
+        # Keyed by path so identical stamps sharing a thumbnail are zipped once
+        written: dict[Path, None] = {}
+
         # Create main manifest
         main_manifest = {
             "Device": {
@@ -147,11 +215,11 @@ def generate_profile(stamps_dir: Path, output_file: Path, device_model: str = "D
 
         with open(profile_dir / "manifest.json", 'w') as f:
             json.dump(main_manifest, f)
+        written[profile_dir / "manifest.json"] = None
 
-        # Create a simple icon for the profile
-        if Image is not None:
-            icon = Image.new('RGBA', (256, 256), (255, 255, 255, 255))
-            icon.save(profile_dir / "icon.png", 'PNG')
+        # Copy the prebuilt profile icon (a plain white 256x256 square)
+        shutil.copyfile(PROFILE_ICON, profile_dir / "icon.png")
+        written[profile_dir / "icon.png"] = None
 
         # Generate actions for each stamp
         actions = {}
@@ -160,29 +228,44 @@ def generate_profile(stamps_dir: Path, output_file: Path, device_model: str = "D
         # We'll place the 13 coloring stamps in reading order (excluding stamp 14 remove tool)
         hotkey_letters = 'ABCDEFGHIJKLM'
 
-        for idx, (stamp_num, stamp_path) in enumerate(stamp_images):
-            if idx >= 13:  # 13 coloring stamps (stamps 1-13, excluding stamp 14 remove tool)
-                break
+        # 13 coloring stamps (stamps 1-13, excluding stamp 14 remove tool)
+        stamps = stamp_images[:13]
+
+        # Read and hash every stamp up front. Identical stamps share one icon,
+        # so each distinct icon is only created (and cached) once
+        stamp_sources: dict[str, bytes] = {}
+        for idx, (stamp_num, stamp_path) in enumerate(stamps):
+            # Read the stamp once; the same bytes are hashed and decoded
+            stamp_data = stamp_path.read_bytes()
+
+            # Generate unique filename for the icon
+            icon_hash = hash_bytes(stamp_data)
+            stamp_sources.setdefault(icon_hash, stamp_data)
 
             # Calculate grid position (col, row) - Ulanzi uses col_row format
             row = idx // 5
             col = idx % 5
             position_key = f"{col}_{row}"
 
-            # Generate unique filename for the icon
-            icon_hash = hash_file(stamp_path)
-            icon_filename = f"{icon_hash}.png"
-
-            # Copy and create thumbnail
-            create_thumbnail(stamp_path, images_dir / icon_filename)
-
             # Create action
             actions[position_key] = create_action(
                 stamp_num,
-                icon_filename,
+                f"{icon_hash}.png",
                 hotkey_letters[idx]
             )
 
+        # Icons are independent and Pillow releases the GIL, so a thread pool
+        # overlaps the thumbnail work across cores
+        with ThreadPoolExecutor() as executor:
+            icon_paths = executor.map(
+                _create_stamp_icon,
+                stamp_sources.values(),
+                stamp_sources.keys(),
+                [images_dir] * len(stamp_sources),
+            )
+            for icon_path in icon_paths:
+                written[icon_path] = None
+
         # Create page manifest
         page_manifest = {
             "Controllers": [
@@ -201,26 +284,28 @@ def generate_profile(stamps_dir: Path, output_file: Path, device_model: str = "D
 
         with open(pages_dir / "manifest.json", 'w') as f:
             json.dump(page_manifest, f)
+        written[pages_dir / "manifest.json"] = None
 
         # Create the zip archive with special header
         output_file.parent.mkdir(parents=True, exist_ok=True)
 
-        # Create zip file
-        with zipfile.ZipFile(output_file, 'w', zipfile.ZIP_DEFLATED) as zf:
+        # Create zip file in memory. Offsets in the sample file are relative to
+        # the start of the zip, not the start of the file, so the archive can't
+        # be written straight after the header into the same file handle
+        zip_buffer = io.BytesIO()
+        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
             # Add all files to the zip
-            for file_path in profile_dir.rglob('*'):
-                if file_path.is_file():
-                    arcname = file_path.relative_to(tmpdir)
-                    zf.write(file_path, arcname)
+            for file_path in written:
+                arcname = file_path.relative_to(tmpdir)
+                # PNGs are already deflate-compressed, so store them as-is
+                compress_type = zipfile.ZIP_STORED if file_path.suffix == '.png' else zipfile.ZIP_DEFLATED
+                zf.write(file_path, arcname, compress_type=compress_type)
 
-        # Prepend the version header (12 bytes)
+        # Write the version header (12 bytes) followed by the archive
         # Based on the sample file: "#Version: 2\nPK"
-        with open(output_file, 'rb') as f:
-            zip_content = f.read()
-
         with open(output_file, 'wb') as f:
             f.write(b'#Version: 2\n')
-            f.write(zip_content)
+            f.write(zip_buffer.getbuffer())
 
     print(f"[SUCCESS] Generated Ulanzi profile: {output_file}")
     print(f"[SUCCESS] Configured {len(stamp_images)} stamps with hotkeys Ctrl+Alt+Shift+A-{hotkey_letters[len(stamp_images)-1]}")